@@ -1,24 +1,28 @@
 """Configuration management for the Supabase MCP server."""
-import os
-from supabase import Client, create_client
+from supabase import AsyncClient
 
-def get_supabase_client() -> Client:
+from .settings import settings
+from . import supabase_client
+
+def get_supabase_client() -> AsyncClient:
     """
-    Create and return a Supabase client using environment variables.
+    Return the shared async Supabase client configured from environment variables.
+
+    The client is built on first use and reused by every later call.
     
     Returns:
-        Supabase Client instance
+        Supabase AsyncClient instance
     
     Raises:
         ValueError: If required environment variables are not set
     """
-    url = os.getenv("SUPABASE_PROJECT_URL")
-    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    
-    if not url or not key:
+    if not settings.supabase_project_url or not settings.supabase_service_role_key:
         raise ValueError(
             "Missing required environment variables. "
             "Please set SUPABASE_PROJECT_URL and SUPABASE_SERVICE_ROLE_KEY"
         )
     
-    return create_client(url, key)
+    client = supabase_client.get_supabase_client()
+    if client is None:
+        raise ValueError("Failed to create Supabase client")
+    return client
@@ -1,6 +1,6 @@
 """Type definitions for the Supabase MCP server."""
 from typing import Dict, List, Optional, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 # Type definitions
 JsonValue = Union[str, int, float, bool, None]
@@ -8,15 +8,27 @@ FilterDict = Dict[str, JsonValue]
 
 class TableQuery(BaseModel):
     """Base model for table operations with common fields."""
+    # Queries are immutable once validated and reject unknown fields
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     table_name: str = Field(..., description="Name of the table to operate on")
 
 class ReadQuery(TableQuery):
     """Model for read operations."""
-    columns: Optional[List[str]] = Field(None, description="List of columns to return. If None, returns all columns")
+    columns: Optional[List[str]] = Field(None, description="List of columns to return. If None, returns the table's default columns (all columns unless configured)")
     filters: Optional[FilterDict] = Field(None, description="Column-value pairs for filtering rows")
-    limit: Optional[int] = Field(None, description="Maximum number of rows to return")
+    limit: Optional[int] = Field(None, description="Maximum number of rows to return (at most 1000)")
     order_by: Optional[Dict[str, str]] = Field(None, description="Column to sort by with direction ('asc' or 'desc')")
 
+class ReadByIdsQuery(TableQuery):
+    """Model for key lookup operations."""
+    key_column: str = Field("id", description="Column to look the keys up in")
+    ids: List[JsonValue] = Field(..., description="Key values of the rows to return")
+
+class CountQuery(TableQuery):
+    """Model for count operations."""
+    filters: Optional[FilterDict] = Field(None, description="Column-value pairs for filtering rows")
+
 class CreateQuery(TableQuery):
     """Model for create operations."""
     records: List[Dict[str, JsonValue]] = Field(..., description="List of records to insert")
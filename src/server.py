@@ -2,31 +2,48 @@
 Supabase MCP Server - A Model Context Protocol server for Supabase database operations.
 Provides tools for CRUD operations on Supabase tables via FastAPI and MCP.
 """
-from dotenv import load_dotenv
-load_dotenv()
-
 import json
-import os
-from typing import Dict, List, Optional
+from functools import lru_cache
 
+import orjson
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
 from fastmcp import FastMCP
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.requests import Request
+from starlette.responses import Response
 
+from .settings import settings
 from .supabase_client import get_supabase_client
-from .tools.database import read_table_rows, create_records, update_records, delete_records
+from .tools.database import read_table_rows, read_by_ids, count_table_rows, create_records, update_records, delete_records
 from .sse import router as sse_router
 from src.db_types import ReadQuery, CreateQuery, UpdateQuery, DeleteQuery
 
+class ServerConfig(BaseModel):
+    """Server settings read from the ``server`` section of config.json."""
+    model_config = ConfigDict(frozen=True)
+
+    name: str = Field(..., description="Server name reported by the API")
+    version: str = Field(..., description="Server version reported by the API")
+    host: str = Field(..., description="Host interface to bind to")
+    port: int = Field(..., description="Default port to listen on")
+
+@lru_cache(maxsize=1)
+def _load_config() -> ServerConfig:
+    """Parse config.json once and return the validated server settings."""
+    with open("config.json") as f:
+        return ServerConfig(**json.load(f)["server"])
+
 # Load configuration
-with open("config.json") as f:
-    config = json.load(f)
+SERVER_NAME = _load_config().name
+SERVER_VERSION = _load_config().version
+SERVER_HOST = _load_config().host
+SERVER_PORT = _load_config().port
 
 # Initialize FastAPI
 app = FastAPI(
-    title=config["server"]["name"],
-    version=config["server"]["version"]
+    title=SERVER_NAME,
+    version=SERVER_VERSION
 )
 
 # Initialize MCP
@@ -37,16 +54,19 @@ supabase = get_supabase_client()
 if not supabase:
     raise RuntimeError("Failed to initialize Supabase client")
 
-@app.get("/health")
-async def health_check() -> Dict[str, str]:
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "version": config["server"]["version"]
-    }
+# Health responses never change, so encode the body once
+_HEALTH_BODY = orjson.dumps({"status": "healthy", "version": SERVER_VERSION})
+
+async def health_check(request: Request) -> Response:
+    """Health check endpoint, served as a plain Starlette route to skip FastAPI's request handling."""
+    return Response(_HEALTH_BODY, media_type="application/json")
+
+app.add_route("/health", health_check, methods=["GET"])
 
 # Register MCP tools
 mcp.tool()(read_table_rows)
+mcp.tool()(read_by_ids)
+mcp.tool()(count_table_rows)
 mcp.tool()(create_records)
 mcp.tool()(update_records)
 mcp.tool()(delete_records)
@@ -56,10 +76,14 @@ app.include_router(sse_router, prefix="/sse", tags=["sse"])
 
 if __name__ == "__main__":
     # Start FastAPI with uvicorn
-    port = int(os.getenv("SERVER_PORT", config["server"]["port"]))
+    port = settings.server_port or SERVER_PORT
+    workers = settings.worker_count()
+    # Multiple workers need an import string so each process can load the app.
+    # uvicorn picks uvloop and httptools on its own when they are installed.
     uvicorn.run(
-        app,
-        host=config["server"]["host"],
+        "src.server:app" if workers > 1 else app,
+        host=SERVER_HOST,
         port=port,
+        workers=workers,
         log_level="info"
     )
@@ -0,0 +1,48 @@
+"""Environment settings for the Supabase MCP server."""
+import os
+from typing import Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class Settings(BaseSettings):
+    """Settings read once from environment variables and the .env file."""
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+
+    supabase_project_url: str = Field("", description="Supabase project URL")
+    supabase_service_role_key: str = Field("", description="Supabase service role key")
+    supabase_max_conns: int = Field(50, description="Maximum pooled HTTP connections to Supabase")
+    server_port: Optional[int] = Field(None, description="Port to listen on, overriding config.json")
+    web_concurrency: Optional[int] = Field(None, description="Number of uvicorn worker processes")
+    redis_url: Optional[str] = Field(None, description="Redis URL used to share SSE events between workers")
+    sse_listener: Optional[bool] = Field(None, description="Whether this process runs the realtime listener")
+    read_cache_enabled: Optional[bool] = Field(None, description="Whether identical reads are served from an in-memory cache")
+    read_cache_ttl: int = Field(30, description="Seconds a cached read stays valid")
+
+    def worker_count(self) -> int:
+        """
+        Decide how many uvicorn workers to run.
+
+        WEB_CONCURRENCY always wins. Otherwise one worker per two CPU cores is
+        used only when REDIS_URL is set, since without Redis each worker keeps its
+        own SSE clients and realtime subscription; in that case a single worker runs.
+        """
+        if self.web_concurrency:
+            return self.web_concurrency
+        if self.redis_url:
+            return max(1, (os.cpu_count() or 1) // 2)
+        return 1
+
+    def use_read_cache(self) -> bool:
+        """
+        Decide whether read_table_rows caches its results.
+
+        READ_CACHE_ENABLED always wins. Otherwise the cache is off when
+        REDIS_URL or WEB_CONCURRENCY is set, since several workers may then run
+        and a write only clears the cache of the worker that made it.
+        """
+        if self.read_cache_enabled is not None:
+            return self.read_cache_enabled
+        return not (self.redis_url or self.web_concurrency)
+
+settings = Settings()
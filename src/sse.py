@@ -12,6 +12,7 @@ Features:
 - Channel status monitoring
 - Automatic reconnection handling
 - Support for multiple concurrent clients
+- Cross-worker fan-out through Redis Pub/Sub when REDIS_URL is set
 
 Example Usage:
     curl -N -H "Accept: text/event-stream" -H "Cache-Control: no-cache" \
@@ -28,37 +29,333 @@ Event Format:
 """
 
 import asyncio
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Dict, Optional
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
-from dotenv import load_dotenv
-import os
-import json
+import orjson
+from redis.asyncio import Redis
 from supabase import AsyncClient
 
-load_dotenv()
+from .config import get_supabase_client
+from .settings import settings
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-connected_clients = []
-recent_event_ids = set()  # Cache for recent event IDs
+connected_clients: Dict[int, asyncio.Queue] = {}  # Client queues keyed by id(queue)
+recent_event_ids: "OrderedDict[str, None]" = OrderedDict()  # LRU of recent event IDs
+
+RECENT_EVENT_IDS_SIZE = 1024  # Rolling window used for deduplication
+CLIENT_QUEUE_SIZE = 256  # Max pending events per client before dropping the oldest
+
+# Optional Redis used to share events between uvicorn workers
+REDIS_URL = settings.redis_url
+SSE_CHANNEL = "sse:events"
+LISTENER_LOCK = "sse:listener"
+LISTENER_LOCK_TTL = 30  # seconds
+STOP_TIMEOUT = 5  # seconds shutdown waits for background tasks
 
-SUPABASE_PROJECT_URL = os.getenv("SUPABASE_PROJECT_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+# Extend the listener lock only while this worker still owns it
+_RENEW_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Delete the listener lock only if this worker still owns it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
 supabase: AsyncClient = None
+redis: Optional[Redis] = None
+
+# Background work owned by this worker, kept so shutdown can stop it
+_relay_task: Optional[asyncio.Task] = None
+_election_task: Optional[asyncio.Task] = None
+_lock_token: Optional[str] = None
+_channel = None
+_channel_status_task: Optional[asyncio.Task] = None
+# Set on shutdown; background loops check it since a cancel() can be lost
+# inside a Redis call on Python 3.11
+_stopping = False
+# Waits between Redis relay and election rounds, replaceable in tests
+_sleep = asyncio.sleep
+
+_log_listener: Optional[QueueListener] = None
+
+def _start_log_listener() -> None:
+    """
+    Route this module's log records through a background thread.
+
+    The event loop only enqueues records; formatting and stream writes happen
+    on the listener thread using the handlers configured on the root logger.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = SimpleQueue()
+    handlers = logging.getLogger().handlers or [logging.StreamHandler()]
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+
+@router.on_event("shutdown")
+async def stop_log_listener():
+    """Flush and stop the background log listener when the application stops."""
+    global _log_listener
+    if _log_listener is None:
+        return
+    _log_listener.stop()
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(handler)
+    logger.propagate = True
+    _log_listener = None
+
+def _sse_frame(event: dict) -> bytes:
+    """
+    Encode an event as a complete SSE ``data:`` frame.
+
+    Falls back to the stdlib encoder for payloads orjson rejects, such as
+    numeric columns holding integers beyond 64 bits.
+    """
+    try:
+        payload = orjson.dumps(event)
+    except orjson.JSONEncodeError:
+        payload = json.dumps(event, separators=(",", ":")).encode()
+    return b"data: " + payload + b"\n\n"
+
+def _safe_put(queue: asyncio.Queue, data: bytes) -> None:
+    """
+    Queue data for a client without waiting.
+
+    If the client has fallen behind and its queue is full, the oldest pending
+    event is dropped so a slow client cannot grow memory without bound.
+    """
+    try:
+        queue.put_nowait(data)
+    except asyncio.QueueFull:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        queue.put_nowait(data)
+
+def _is_duplicate_event(event_id: Optional[str]) -> bool:
+    """
+    Check an event ID against the recent-events window and record it.
+
+    Events without an ID can't be deduplicated and are never reported as
+    duplicates. Once the window is full only the oldest ID is evicted.
+    """
+    if event_id is None:
+        return False
+    if event_id in recent_event_ids:
+        recent_event_ids.move_to_end(event_id)
+        return True
+    recent_event_ids[event_id] = None
+    if len(recent_event_ids) > RECENT_EVENT_IDS_SIZE:
+        recent_event_ids.popitem(last=False)
+    return False
+
+def _broadcast(data: bytes) -> None:
+    """Fan data out to every SSE client connected to this worker."""
+    # Snapshot so clients disconnecting mid-broadcast don't mutate the iteration
+    for queue in tuple(connected_clients.values()):
+        _safe_put(queue, data)
+
+async def _publish(frame: bytes) -> None:
+    """
+    Deliver a frame to every SSE client of the application.
+
+    With Redis configured the frame is published so that every worker,
+    including this one, relays it to its own clients. Otherwise it is
+    broadcast to this worker's clients directly.
+    """
+    if redis is None:
+        _broadcast(frame)
+    else:
+        await redis.publish(SSE_CHANNEL, frame)
+
+async def _relay_published_events():
+    """Forward frames published on the Redis channel to this worker's clients."""
+    while not _stopping:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(SSE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _broadcast(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Lost Redis subscription, reconnecting")
+            await _sleep(1)
+
+async def _elect_realtime_listener():
+    """
+    Start the Supabase realtime listener in exactly one worker.
+
+    SSE_LISTENER=1 or SSE_LISTENER=0 pins the choice explicitly. Otherwise,
+    with Redis configured, workers compete for a short-lived lock and the
+    holder keeps renewing it; if the holder dies, another worker takes over
+    once the lock expires. A worker that fails to subscribe releases the lock
+    straight away, and one that loses the lock unsubscribes before competing
+    again. Without Redis every worker listens on its own. The loop ends once
+    shutdown sets the stop flag.
+    """
+    global _lock_token
+    pinned = settings.sse_listener
+    if pinned is not None or redis is None:
+        if pinned is not False:
+            await _run_realtime_listener()
+        return
+
+    token = _lock_token = uuid.uuid4().hex
+    while not _stopping:
+        if not await _acquire_listener_lock(token):
+            return
+        logger.info("Elected as realtime listener")
+        if await _run_realtime_listener():
+            await _hold_listener_lock(token)
+            if _stopping:
+                # stop_sse unsubscribes and releases the lock itself
+                return
+            logger.warning("Lost realtime listener lock, unsubscribing")
+            await stop_supabase_realtime_listener()
+        else:
+            await _release_listener_lock(token)
+        # Give the other workers a chance at the lock before competing again
+        await _sleep(LISTENER_LOCK_TTL / 3)
+
+async def _acquire_listener_lock(token: str) -> bool:
+    """
+    Wait until this worker holds the listener lock.
+
+    Returns:
+        True once the lock is held, False if shutdown began first
+    """
+    while not _stopping:
+        try:
+            if await redis.set(LISTENER_LOCK, token, nx=True, ex=LISTENER_LOCK_TTL):
+                return True
+        except Exception:
+            logger.exception("Failed to acquire realtime listener lock")
+        await _sleep(LISTENER_LOCK_TTL / 3)
+    return False
+
+async def _hold_listener_lock(token: str) -> None:
+    """
+    Keep renewing the listener lock, returning once it is lost or on shutdown.
+
+    The lock counts as lost when another worker owns it or when it could not
+    be renewed for a full TTL, since it may have expired in the meantime.
+    """
+    loop = asyncio.get_running_loop()
+    renewed_at = loop.time()
+    while not _stopping:
+        await _sleep(LISTENER_LOCK_TTL / 3)
+        if _stopping:
+            return
+        try:
+            if not await redis.eval(
+                _RENEW_LOCK_SCRIPT, 1, LISTENER_LOCK, token, LISTENER_LOCK_TTL
+            ):
+                return
+            renewed_at = loop.time()
+        except Exception:
+            logger.exception("Failed to renew realtime listener lock")
+            if loop.time() - renewed_at >= LISTENER_LOCK_TTL:
+                return
+
+async def _release_listener_lock(token: str) -> None:
+    """Delete the listener lock if this worker still holds it."""
+    try:
+        await redis.eval(_RELEASE_LOCK_SCRIPT, 1, LISTENER_LOCK, token)
+    except Exception:
+        logger.exception("Failed to release realtime listener lock")
+
+async def _run_realtime_listener() -> bool:
+    """
+    Start the realtime listener, logging instead of losing startup errors.
+
+    Returns:
+        True if the channel was subscribed, False if startup failed
+    """
+    try:
+        await start_supabase_realtime_listener()
+    except Exception:
+        logger.exception("Failed to start Supabase realtime listener")
+        return False
+    return True
 
 @router.on_event("startup")
+async def start_sse():
+    """
+    Set up SSE fan-out when the FastAPI application starts up.
+
+    Connects to Redis when REDIS_URL is set and starts relaying published
+    events to this worker's clients, then elects the worker that listens to
+    Supabase realtime changes.
+    """
+    global redis, _relay_task, _election_task, _stopping
+    _stopping = False
+    _start_log_listener()
+    if REDIS_URL:
+        redis = Redis.from_url(REDIS_URL)
+        _relay_task = asyncio.create_task(_relay_published_events())
+    _election_task = asyncio.create_task(_elect_realtime_listener())
+
+@router.on_event("shutdown")
+async def stop_sse():
+    """
+    Stop SSE fan-out when the application stops.
+
+    Stops the relay and election tasks, unsubscribes the realtime channel,
+    hands the listener lock back if this worker holds it and closes Redis.
+    """
+    global redis, _relay_task, _election_task, _lock_token, _stopping
+    _stopping = True
+    tasks = [task for task in (_election_task, _relay_task) if task is not None]
+    for task in tasks:
+        task.cancel()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*tasks, return_exceptions=True), timeout=STOP_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.warning("SSE background tasks did not stop within %ss", STOP_TIMEOUT)
+    _relay_task = _election_task = None
+
+    await stop_supabase_realtime_listener()
+    if redis is not None:
+        if _lock_token is not None:
+            await _release_listener_lock(_lock_token)
+        await redis.aclose()
+        redis = None
+    _lock_token = None
+
 async def start_supabase_realtime_listener():
     """
-    Initialize Supabase client and set up realtime event listener.
+    Set up the Supabase realtime event listener.
     
-    This function is called when the FastAPI application starts up.
-    It initializes the Supabase client and sets up a realtime event listener
-    to forward database events to connected SSE clients.
+    This function runs in the worker elected at startup. It subscribes the
+    shared Supabase client to database changes and publishes each event to
+    connected SSE clients.
     """
-    global supabase
-    print("\nInitializing Supabase client...")
-    supabase = await AsyncClient.create(SUPABASE_PROJECT_URL, SUPABASE_SERVICE_ROLE_KEY)
-    print("Supabase client initialized!")
+    global supabase, _channel, _channel_status_task
+    supabase = get_supabase_client()
 
     async def handle_realtime_event(payload):
         """
@@ -68,39 +365,27 @@ async def start_supabase_realtime_listener():
             payload (dict): The event payload from Supabase containing the database change
                           information including table, schema, and record data.
         """
-        print(f"\n*** DATABASE EVENT RECEIVED ***")
-        print(f"Event payload: {json.dumps(payload, indent=2)}")
+        logger.debug("Database event received: %s", payload)
         try:
             # Check for duplicate events
-            event_id = payload.get('ids', [None])[0]
-            if event_id in recent_event_ids:
-                print(f"Skipping duplicate event with ID: {event_id}")
+            event_id = (payload.get('ids') or [None])[0]
+            if _is_duplicate_event(event_id):
+                logger.debug("Skipping duplicate event with ID: %s", event_id)
                 return
-            
-            # Add to recent events
-            recent_event_ids.add(event_id)
-            if len(recent_event_ids) > 1000:  # Prevent unbounded growth
-                recent_event_ids.clear()
-
-            # Extract the actual data from the payload
-            event_data = json.dumps({
+
+            # Extract the actual data from the payload and frame it once for all clients
+            event_frame = _sse_frame({
                 "type": payload["data"]["type"],
                 "table": payload["data"]["table"],
                 "schema": payload["data"]["schema"],
                 "record": payload["data"].get("record") or payload["data"].get("old_record"),
                 "timestamp": payload["data"]["commit_timestamp"]
             })
-            print(f"Number of connected clients: {len(connected_clients)}")
-            for queue in connected_clients:
-                print(f"Putting data in queue: {id(queue)}")
-                await queue.put(event_data)
-                print(f"Successfully queued event for client: {id(queue)}")
-        except Exception as e:
-            print(f"Error in handle_realtime_event: {str(e)}")
-            import traceback
-            print(traceback.format_exc())
-
-    print("\nSetting up Supabase realtime channel...")
+            await _publish(event_frame)
+        except Exception:
+            logger.exception("Error in handle_realtime_event")
+
+    logger.info("Setting up Supabase realtime channel...")
     
     # Create a wrapper to handle the async callback
     def sync_callback(payload):
@@ -117,26 +402,39 @@ async def start_supabase_realtime_listener():
         )
     )
     
-    print("Subscribing to channel...")
+    logger.info("Subscribing to channel...")
     await channel.subscribe()
-    print("Channel subscription complete!")
+    _channel = channel
+    logger.info("Channel subscription complete")
 
     async def check_channel_status():
         """Periodically check and report the channel connection status."""
         while True:
             try:
-                print("\nChecking channel status...")
                 if channel.is_joined:
-                    print("Channel is joined and listening for events")
+                    logger.debug("Channel is joined and listening for events")
                 else:
-                    print("Warning: Channel is not joined!")
+                    logger.warning("Channel is not joined")
                 await asyncio.sleep(10)
-            except Exception as e:
-                print(f"Error checking channel status: {e}")
+            except Exception:
+                logger.exception("Error checking channel status")
                 await asyncio.sleep(10)
 
     # Start channel status checker
-    asyncio.create_task(check_channel_status())
+    _channel_status_task = asyncio.create_task(check_channel_status())
+
+async def stop_supabase_realtime_listener():
+    """Unsubscribe the realtime channel and stop its status checker, if running."""
+    global _channel, _channel_status_task
+    if _channel_status_task is not None:
+        _channel_status_task.cancel()
+        _channel_status_task = None
+    if _channel is not None:
+        channel, _channel = _channel, None
+        try:
+            await channel.unsubscribe()
+        except Exception:
+            logger.exception("Failed to unsubscribe Supabase realtime channel")
 
 @router.get("/stream")
 async def sse_stream(request: Request):
@@ -149,15 +447,13 @@ async def sse_stream(request: Request):
     Returns:
         StreamingResponse: An SSE stream that sends database events to the client.
     """
-    print("New client connected to SSE stream")  # Debug log
-    queue = asyncio.Queue()
+    queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
     queue_id = id(queue)
-    print(f"Created queue with ID: {queue_id}")  # Debug queue ID
-    connected_clients.append(queue)
-    print(f"Total connected clients: {len(connected_clients)}")  # Debug client count
+    connected_clients[queue_id] = queue
+    logger.debug("Client %s connected, total clients: %d", queue_id, len(connected_clients))
 
     # Send a test message immediately
-    await queue.put(json.dumps({"type": "test", "message": "SSE connection established"}))
+    await queue.put(_sse_frame({"type": "test", "message": "SSE connection established"}))
 
     async def event_generator():
         """
@@ -167,23 +463,15 @@ async def sse_stream(request: Request):
         to the client. It runs indefinitely until the client disconnects.
         """
         try:
-            print(f"Starting event generator for queue: {queue_id}")  # Debug generator start
             while True:
                 if await request.is_disconnected():
-                    print(f"Client disconnected for queue: {queue_id}")  # Debug disconnect
                     break
-                print(f"Waiting for data on queue: {queue_id}")  # Debug queue wait
-                data = await queue.get()
-                print(f"Got data from queue {queue_id}: {data}")  # Debug data received
-                message = f"data: {data}\n\n"
-                print(f"Sending SSE message for queue {queue_id}: {message}")  # Debug send
-                yield message
-                print(f"Sent SSE message for queue {queue_id}")  # Debug sent
-        except Exception as e:
-            print(f"Error in event_generator for queue {queue_id}: {e}")  # Debug errors
+                yield await queue.get()
+        except Exception:
+            logger.exception("Error in event_generator for client %s", queue_id)
         finally:
-            connected_clients.remove(queue)
-            print(f"Removed queue {queue_id}, remaining clients: {len(connected_clients)}")  # Debug cleanup
+            connected_clients.pop(queue_id, None)
+            logger.debug("Client %s disconnected, remaining clients: %d", queue_id, len(connected_clients))
 
     return StreamingResponse(
         event_generator(),
@@ -206,9 +494,6 @@ async def post_message(request: Request):
         dict: A response indicating that the message was sent.
     """
     body = await request.json()
-    message = json.dumps({"type": "message", "content": body.get("message", "")})
-    
-    for queue in connected_clients:
-        await queue.put(message)
+    await _publish(_sse_frame({"type": "message", "content": body.get("message", "")}))
     
     return {"status": "sent"}
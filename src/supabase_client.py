@@ -1,21 +1,39 @@
 """Supabase client configuration and authentication."""
 import logging
-import os
+from functools import lru_cache
 from typing import Optional
 
 import httpx
-from supabase import Client, create_client
-from pydantic import BaseModel, Field
+from supabase import AsyncClient, AsyncClientOptions
+
+from .settings import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SupabaseConfig(BaseModel):
-    """Configuration for Supabase client."""
-    url: str = Field(..., description="Supabase project URL")
-    key: str = Field(..., description="Supabase service role key")
-    # access_token: str = Field(..., description="Personal access token for management API")
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create the pooled HTTP client shared by the PostgREST, auth and storage clients.
+
+    Connections are kept alive between tool calls so that bursts of small queries
+    reuse an open TLS session instead of paying for a new handshake each time.
+    The pool size can be tuned with the SUPABASE_MAX_CONNS environment variable.
+
+    Returns:
+        httpx.AsyncClient: HTTP/2 client with keep-alive connection pooling
+    """
+    max_connections = settings.supabase_max_conns
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_keepalive_connections=min(20, max_connections),
+            max_connections=max_connections,
+            keepalive_expiry=30,
+        ),
+        http2=True,
+        timeout=httpx.Timeout(10.0, connect=3.0),
+        follow_redirects=True,
+    )
 
 # def validate_access_token(access_token: str) -> bool:
 #     """
@@ -41,30 +59,34 @@ class SupabaseConfig(BaseModel):
 #         logger.error(f"Failed to validate access token: {str(e)}")
 #         return False
 
-def get_supabase_client() -> Optional[Client]:
+@lru_cache(maxsize=1)
+def _create_supabase_client() -> AsyncClient:
     """
-    Create and return a Supabase client using only project URL and service role key.
+    Build the process-wide async Supabase client.
 
-    Returns:
-        Optional[Client]: Authenticated Supabase client or None if validation fails
+    Only successful constructions are cached; a failure raises, so the next
+    call tries again instead of reusing a broken result.
+    """
+    client = AsyncClient(
+        settings.supabase_project_url,
+        settings.supabase_service_role_key,
+        options=AsyncClientOptions(httpx_client=create_http_client())
+    )
+    logger.info("Successfully created Supabase client")
+    return client
 
-    Raises:
-        ValueError: If required environment variables are missing
+def get_supabase_client() -> Optional[AsyncClient]:
     """
-    try:
-        config = SupabaseConfig(
-            url=os.getenv("SUPABASE_PROJECT_URL", ""),
-            key=os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
-        )
-    except ValueError as e:
-        logger.error(f"Missing required environment variables: {str(e)}")
-        raise
+    Create and return an async Supabase client using only project URL and service role key.
 
+    The client is built on first use and reused by every later call.
+
+    Returns:
+        Optional[AsyncClient]: Authenticated Supabase client or None if validation fails
+    """
     # Access token validation is not required for standard client usage
     try:
-        client = create_client(config.url, config.key)
-        logger.info("Successfully created Supabase client")
-        return client
+        return _create_supabase_client()
     except Exception as e:
         logger.error(f"Failed to create Supabase client: {str(e)}")
         return None
@@ -1,13 +1,81 @@
 """Database operation tools for the Supabase MCP server."""
-from typing import Dict, List
+import asyncio
+import hashlib
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from src.db_types import ReadQuery, CreateQuery, UpdateQuery, DeleteQuery
+import orjson
+from cachetools import TTLCache
+
+from src.db_types import JsonValue, ReadQuery, ReadByIdsQuery, CountQuery, CreateQuery, UpdateQuery, DeleteQuery
 from ..config import get_supabase_client
+from ..settings import settings
+from .loader import get_loader, key_token
+
+# Columns selected when a read doesn't list any; tables not listed here get "*"
+DEFAULT_SELECT_COLUMNS_BY_TABLE: Dict[str, List[str]] = {}
+
+# Upper bound on rows returned by a single read
+MAX_READ_ROWS = 1000
+
+# Read-through cache for read_table_rows results, stored as encoded JSON so
+# every hit decodes a fresh list that callers are free to mutate
+READ_CACHE_MAXSIZE = 1024
+READ_CACHE_TTL = settings.read_cache_ttl  # seconds
+# Writes only invalidate the cache of the worker that made them, so caching
+# must stay off whenever several workers serve requests
+READ_CACHE_ENABLED = settings.use_read_cache()
+
+_read_cache: TTLCache = TTLCache(maxsize=READ_CACHE_MAXSIZE, ttl=READ_CACHE_TTL)
+_table_versions: Dict[str, int] = {}
+
+def _read_cache_key(query: ReadQuery) -> Optional[Tuple[str, int, bytes]]:
+    """
+    Build the cache key for a read query.
+
+    The key embeds the table's current version, so bumping the version in
+    invalidate_table() makes every cached read of that table unreachable.
+    Returns None for queries orjson can't encode, such as filters on integers
+    beyond 64 bits, which are then read without the cache.
+    """
+    try:
+        payload = orjson.dumps(query.model_dump(mode="json"), option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        return None
+    digest = hashlib.blake2b(payload, digest_size=16).digest()
+    return query.table_name, _table_versions.get(query.table_name, 0), digest
+
+def invalidate_table(table_name: str) -> None:
+    """
+    Drop all cached reads for a table.
+
+    Writes call this even when they raise, since a request that timed out on
+    the client may still have committed on the server.
+
+    Args:
+        table_name: Name of the table whose cached reads are stale
+    """
+    _table_versions[table_name] = _table_versions.get(table_name, 0) + 1
 
-# Initialize Supabase client
-supabase = get_supabase_client()
+def _build_select(query: ReadQuery):
+    """Build the filtered, ordered select for a read query without a row limit."""
+    db_query = get_supabase_client().table(query.table_name)
+    
+    columns = query.columns or DEFAULT_SELECT_COLUMNS_BY_TABLE.get(query.table_name)
+    if columns:
+        db_query = db_query.select(",".join(columns))
+    else:
+        db_query = db_query.select("*")
+    
+    if query.filters:
+        db_query = db_query.match(query.filters)
+    
+    if query.order_by:
+        for column, direction in query.order_by.items():
+            db_query = db_query.order(column, desc=direction.lower() == "desc")
+    
+    return db_query
 
-def read_table_rows(query: ReadQuery) -> List[Dict]:
+async def read_table_rows(query: ReadQuery) -> List[Dict]:
     """
     Read and filter rows from a Supabase table.
     
@@ -22,33 +90,129 @@ def read_table_rows(query: ReadQuery) -> List[Dict]:
             - table_name: Name of the table to read from
             - columns: Optional list of columns to return
             - filters: Optional filtering criteria
-            - limit: Optional maximum number of rows
+            - limit: Optional maximum number of rows (capped at MAX_READ_ROWS)
             - order_by: Optional sorting criteria
     
     Returns:
         List of dictionaries representing the matching rows
     """
-    db_query = supabase.table(query.table_name)
+    cache_key = _read_cache_key(query) if READ_CACHE_ENABLED else None
+    cached = _read_cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        return orjson.loads(cached)
+
+    db_query = _build_select(query)
+    db_query = db_query.limit(min(query.limit or MAX_READ_ROWS, MAX_READ_ROWS))
     
-    if query.columns:
-        db_query = db_query.select(",".join(query.columns))
-    else:
-        db_query = db_query.select("*")
+    response = await db_query.execute()
+    rows = response.data
+    if cache_key is not None:
+        try:
+            _read_cache[cache_key] = orjson.dumps(rows)
+        except orjson.JSONEncodeError:
+            # numeric columns can hold integers beyond orjson's 64-bit range
+            pass
+    return rows
+
+async def iter_table_rows(query: ReadQuery, page_size: int = 500) -> AsyncIterator[Dict]:
+    """
+    Stream rows from a Supabase table one page at a time.
     
-    if query.filters:
-        for column, value in query.filters.items():
-            db_query = db_query.eq(column, value)
+    Unlike read_table_rows, results are neither cached nor capped at
+    MAX_READ_ROWS. Only one page is held in memory at a time. Pass an order_by
+    on a unique column to get stable pages while the table is being written to.
+    PostgREST silently caps each response at its db-max-rows setting, so a
+    short page doesn't mean the table is exhausted; paging stops only once a
+    request returns no rows.
     
-    if query.order_by:
-        for column, direction in query.order_by.items():
-            db_query = db_query.order(column, ascending=(direction.lower() == "asc"))
+    Args:
+        query: ReadQuery object; limit, if set, caps the total rows yielded
+        page_size: Number of rows fetched per request
     
-    if query.limit:
-        db_query = db_query.limit(query.limit)
+    Yields:
+        Dictionaries representing the matching rows
+
+    Raises:
+        ValueError: If page_size is less than 1
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+    remaining = query.limit
+    offset = 0
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        response = await _build_select(query).range(offset, offset + size - 1).execute()
+        chunk = response.data
+        if not chunk:
+            break
+        for row in chunk:
+            yield row
+        offset += len(chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
+
+async def read_by_ids(query: ReadByIdsQuery) -> List[Dict]:
+    """
+    Fetch rows from a Supabase table by key.
     
-    return db_query.execute().data
+    Perfect for:
+    - Looking up records by primary key
+    - Resolving many foreign keys at once
+    - Repeated single-row lookups issued in quick succession
+    
+    Lookups against the same table and column that arrive within a few
+    milliseconds of each other are combined into a single query.
+    
+    Args:
+        query: ReadByIdsQuery object containing:
+            - table_name: Name of the table to read from
+            - key_column: Column to match the keys against (defaults to "id")
+            - ids: Key values to look up
+    
+    Returns:
+        List of matching rows, in the order of the requested keys
+    """
+    # Keys are matched as PostgREST spells them, so 1, 1.0 and "1" name the same rows
+    unique_keys: Dict[str, JsonValue] = {}
+    for key in query.ids:
+        unique_keys.setdefault(key_token(key), key)
+
+    loader = get_loader(query.table_name, query.key_column)
+    results = await asyncio.gather(*(loader.load(key) for key in unique_keys.values()))
+    return [row for rows in results for row in rows]
+
+async def count_table_rows(query: CountQuery) -> int:
+    """
+    Count rows in a Supabase table that match specific criteria.
+    
+    Perfect for:
+    - Checking how many records match a filter before reading them
+    - Getting table sizes without transferring any rows
+    
+    Other tools never request counts, so their reads don't pay for the extra
+    counting work in PostgREST. Use this tool when a count is needed.
+    
+    Args:
+        query: CountQuery object containing:
+            - table_name: Name of the table to count rows in
+            - filters: Optional filtering criteria
+    
+    Returns:
+        Number of matching rows
+
+    Raises:
+        RuntimeError: If the response carries no row count, e.g. because a
+            proxy stripped the Content-Range header
+    """
+    db_query = get_supabase_client().table(query.table_name).select("*", count="exact", head=True)
+    if query.filters:
+        db_query = db_query.match(query.filters)
+    response = await db_query.execute()
+    if response.count is None:
+        raise RuntimeError(f"No row count returned for table {query.table_name!r}")
+    return response.count
 
-def create_records(query: CreateQuery) -> List[Dict]:
+async def create_records(query: CreateQuery) -> List[Dict]:
     """
     Create one or multiple records in a Supabase table.
     
@@ -65,9 +229,13 @@ def create_records(query: CreateQuery) -> List[Dict]:
     Returns:
         List of created records with their assigned IDs
     """
-    return supabase.table(query.table_name).insert(query.records).execute().data
+    try:
+        response = await get_supabase_client().table(query.table_name).insert(query.records).execute()
+    finally:
+        invalidate_table(query.table_name)
+    return response.data
 
-def update_records(query: UpdateQuery) -> List[Dict]:
+async def update_records(query: UpdateQuery) -> List[Dict]:
     """
     Update records in a Supabase table that match specific criteria.
     
@@ -85,14 +253,17 @@ def update_records(query: UpdateQuery) -> List[Dict]:
     Returns:
         List of updated records
     """
-    db_query = supabase.table(query.table_name)
+    db_query = get_supabase_client().table(query.table_name)
     update_call = db_query.update(query.updates)
     if query.filters:
-        for column, value in query.filters.items():
-            update_call = update_call.eq(column, value)
-    return update_call.execute().data
+        update_call = update_call.match(query.filters)
+    try:
+        response = await update_call.execute()
+    finally:
+        invalidate_table(query.table_name)
+    return response.data
 
-def delete_records(query: DeleteQuery) -> List[Dict]:
+async def delete_records(query: DeleteQuery) -> List[Dict]:
     """
     Delete records from a Supabase table that match specific criteria.
     
@@ -114,9 +285,12 @@ def delete_records(query: DeleteQuery) -> List[Dict]:
     Returns:
         List of deleted records
     """
-    db_query = supabase.table(query.table_name)
+    db_query = get_supabase_client().table(query.table_name)
     delete_call = db_query.delete()
     if query.filters:
-        for column, value in query.filters.items():
-            delete_call = delete_call.eq(column, value)
-    return delete_call.execute().data
+        delete_call = delete_call.match(query.filters)
+    try:
+        response = await delete_call.execute()
+    finally:
+        invalidate_table(query.table_name)
+    return response.data
@@ -0,0 +1,149 @@
+"""Request batching for key lookups against Supabase tables."""
+import asyncio
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+
+from postgrest.exceptions import APIError
+
+from src.db_types import JsonValue
+from ..config import get_supabase_client
+
+def key_token(value: JsonValue) -> str:
+    """
+    Spell a key the way PostgREST returns it, so keys and rows compare equal.
+
+    PostgREST casts each ``IN`` value to the column's type, so ``1.0`` finds
+    an integer row with ``id`` 1 and an upper-case UUID finds its lower-case
+    row. Integral floats are written as integers and UUIDs in canonical
+    lower-case form; other values are compared as text.
+
+    Args:
+        value: Requested key or the key column of a returned row
+
+    Returns:
+        Text used to match rows to the keys that requested them
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, str):
+        try:
+            return str(uuid.UUID(value))
+        except ValueError:
+            pass
+    return str(value)
+
+class KeyLoader:
+    """
+    Coalesce concurrent single-key reads into one ``IN`` query.
+
+    Keys requested within ``batch_window_ms`` of each other are fetched together
+    with ``select * ... where key_column in (...)`` and each caller receives only
+    the rows matching its own key. A batch is sent early once ``max_batch`` keys
+    are pending. Every caller gets its own future, so cancelling one caller
+    never affects others waiting on the same key. If PostgREST rejects a
+    batch, its keys are retried one by one so a bad key only fails the callers
+    that asked for it. Transport errors such as timeouts fail every caller
+    straight away rather than multiplying requests during an outage.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        key_column: str,
+        batch_window_ms: float = 10,
+        max_batch: int = 100,
+    ) -> None:
+        self.table = table
+        self.key_column = key_column
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: Dict[str, Tuple[JsonValue, List[asyncio.Future]]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Strong references so in-flight batches aren't garbage-collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: JsonValue) -> "asyncio.Future[List[Dict]]":
+        """
+        Schedule a key for the next batch.
+
+        Args:
+            key: Value of ``key_column`` to look up
+
+        Returns:
+            Future resolving to the list of rows whose ``key_column`` equals key
+        """
+        token = key_token(key)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if token in self._pending:
+            self._pending[token][1].append(future)
+            return future
+        self._pending[token] = (key, [future])
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        """Send all pending keys as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._fetch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: Dict[str, Tuple[JsonValue, List[asyncio.Future]]]) -> None:
+        """Run the ``IN`` query for a batch and resolve its futures."""
+        try:
+            keys = [key for key, _ in batch.values()]
+            response = await (
+                get_supabase_client()
+                .table(self.table)
+                .select("*")
+                .in_(self.key_column, keys)
+                .execute()
+            )
+        except Exception as e:
+            if isinstance(e, APIError) and len(batch) > 1:
+                await asyncio.gather(
+                    *(self._fetch({token: entry}) for token, entry in batch.items())
+                )
+                return
+            for _, futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        rows_by_key: Dict[str, List[Dict]] = {}
+        for row in response.data:
+            rows_by_key.setdefault(key_token(row.get(self.key_column)), []).append(row)
+        for token, (_, futures) in batch.items():
+            rows = rows_by_key.get(token, [])
+            for future in futures:
+                if not future.done():
+                    # Separate copies so one caller's changes can't leak to another
+                    future.set_result([dict(row) for row in rows])
+
+_loaders: Dict[Tuple[str, str], KeyLoader] = {}
+
+def get_loader(table: str, key_column: str) -> KeyLoader:
+    """
+    Return the shared loader for a table and key column.
+
+    Args:
+        table: Name of the table to read from
+        key_column: Column the lookups are keyed on
+
+    Returns:
+        KeyLoader instance reused by every caller for that table and column
+    """
+    loader = _loaders.get((table, key_column))
+    if loader is None:
+        loader = _loaders[(table, key_column)] = KeyLoader(table, key_column)
+    return loader
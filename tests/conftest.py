@@ -0,0 +1,114 @@
+"""Shared fixtures for the Supabase MCP server tests."""
+import asyncio
+import inspect
+from typing import Any, Dict, List, Optional
+
+import pytest
+from postgrest import (
+    AsyncFilterRequestBuilder,
+    AsyncQueryRequestBuilder,
+    AsyncRequestBuilder,
+    AsyncSelectRequestBuilder,
+)
+
+from src.tools.loader import key_token
+
+# Builder each postgrest call returns, so chained calls are checked against it
+_NEXT_BUILDER = {
+    "select": AsyncSelectRequestBuilder,
+    "insert": AsyncQueryRequestBuilder,
+    "update": AsyncFilterRequestBuilder,
+    "delete": AsyncFilterRequestBuilder,
+}
+
+class FakeResponse:
+    """Stand-in for a PostgREST APIResponse."""
+
+    def __init__(self, data: List[Dict], count: Optional[int] = None) -> None:
+        self.data = data
+        self.count = count
+
+class FakeQuery:
+    """
+    Records builder calls and serves rows from the owning FakeSupabase.
+
+    Every call is checked against the signature of the matching postgrest
+    builder method, so code passing arguments postgrest doesn't accept fails
+    here as it would against a real client.
+    """
+
+    def __init__(self, client: "FakeSupabase", table: str) -> None:
+        self.client = client
+        self.table = table
+        self.calls: List[tuple] = []
+        self.builder: type = AsyncRequestBuilder
+
+    def __getattr__(self, name: str):
+        real = getattr(self.builder, name, None)
+        if name.startswith("_") or not callable(real):
+            raise AttributeError(f"{self.builder.__name__} has no method {name!r}")
+
+        def method(*args: Any, **kwargs: Any) -> "FakeQuery":
+            inspect.signature(real).bind(self, *args, **kwargs)
+            self.calls.append((name, args, kwargs))
+            self.builder = _NEXT_BUILDER.get(name, self.builder)
+            return self
+        return method
+
+    def args(self, name: str) -> Optional[tuple]:
+        """Return the arguments of the first call to a builder method."""
+        for call, args, _ in self.calls:
+            if call == name:
+                return args
+        return None
+
+    async def execute(self) -> FakeResponse:
+        self.client.executed.append(self)
+        # Rows are read when the request is sent, like a server snapshot
+        rows = [dict(row) for row in self.client.rows]
+        in_args = self.args("in_")
+        if in_args is not None:
+            column, keys = in_args
+            # PostgREST casts IN values to the column type, so 1.0 matches 1
+            wanted = {key_token(key) for key in keys}
+            rows = [row for row in rows if key_token(row.get(column)) in wanted]
+        range_args = self.args("range")
+        if range_args is not None:
+            start, end = range_args
+            rows = rows[start:end + 1]
+        if self.client.max_rows is not None:
+            rows = rows[:self.client.max_rows]
+
+        if self.client.gate is not None:
+            await self.client.gate.wait()
+        if self.client.error is not None:
+            raise self.client.error
+        return FakeResponse(rows, self.client.count)
+
+class FakeSupabase:
+    """Minimal async Supabase client double backed by an in-memory row list."""
+
+    def __init__(self) -> None:
+        self.rows: List[Dict] = []
+        self.executed: List[FakeQuery] = []
+        self.gate: Optional[asyncio.Event] = None
+        self.error: Optional[Exception] = None
+        # Like PostgREST's db-max-rows, silently caps the rows per response
+        self.max_rows: Optional[int] = None
+        # Value of the count header returned with every response
+        self.count: Optional[int] = None
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+@pytest.fixture
+def fake_supabase(monkeypatch) -> FakeSupabase:
+    """Route the database tools to an in-memory fake client."""
+    from src.tools import database, loader
+
+    client = FakeSupabase()
+    monkeypatch.setattr(database, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(loader, "get_supabase_client", lambda: client)
+    database._read_cache.clear()
+    database._table_versions.clear()
+    return client
@@ -0,0 +1,208 @@
+"""Tests for the database tools using an in-memory Supabase client."""
+import asyncio
+
+import pytest
+
+from src.db_types import ReadQuery, CountQuery, DeleteQuery
+from src.tools import database
+from src.tools.database import read_table_rows, count_table_rows, delete_records, iter_table_rows
+
+def test_read_cache_hit(fake_supabase):
+    """Test that an identical read is served from the cache."""
+    fake_supabase.rows = [{"id": 1}]
+
+    async def run():
+        first = await read_table_rows(ReadQuery(table_name="users", limit=5))
+        second = await read_table_rows(ReadQuery(table_name="users", limit=5))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == [{"id": 1}]
+    assert len(fake_supabase.executed) == 1
+
+def test_read_cache_disabled_for_several_workers(fake_supabase, monkeypatch):
+    """Test that reads always hit the database when the cache is turned off."""
+    monkeypatch.setattr(database, "READ_CACHE_ENABLED", False)
+    fake_supabase.rows = [{"id": 1}]
+
+    async def run():
+        await read_table_rows(ReadQuery(table_name="users", limit=5))
+        await read_table_rows(ReadQuery(table_name="users", limit=5))
+
+    asyncio.run(run())
+    assert len(fake_supabase.executed) == 2
+    assert not database._read_cache
+
+def test_read_cache_miss_on_different_query(fake_supabase):
+    """Test that reads with different parameters are cached separately."""
+    fake_supabase.rows = [{"id": 1}]
+
+    async def run():
+        await read_table_rows(ReadQuery(table_name="users", limit=5))
+        await read_table_rows(ReadQuery(table_name="users", limit=10))
+
+    asyncio.run(run())
+    assert len(fake_supabase.executed) == 2
+
+def test_read_cache_hits_are_independent_copies(fake_supabase):
+    """Test that mutating a result does not change later cache hits."""
+    fake_supabase.rows = [{"id": 1}]
+
+    async def run():
+        first = await read_table_rows(ReadQuery(table_name="users"))
+        first.append({"id": 2})
+        first[0]["id"] = 99
+        second = await read_table_rows(ReadQuery(table_name="users"))
+        second.clear()
+        return await read_table_rows(ReadQuery(table_name="users"))
+
+    assert asyncio.run(run()) == [{"id": 1}]
+    assert len(fake_supabase.executed) == 1
+
+def test_read_with_big_integers_skips_cache(fake_supabase):
+    """Test that rows and filters beyond 64-bit integers are read uncached."""
+    fake_supabase.rows = [{"id": 1, "balance": 123456789012345678901234567890}]
+
+    async def run():
+        by_row = await read_table_rows(ReadQuery(table_name="accounts"))
+        by_filter = await read_table_rows(ReadQuery(table_name="accounts", filters={"balance": 2**70}))
+        return by_row, by_filter
+
+    by_row, by_filter = asyncio.run(run())
+    assert by_row == by_filter == fake_supabase.rows
+    assert fake_supabase.executed[1].args("match") == ({"balance": 2**70},)
+    assert not database._read_cache
+
+def test_write_invalidates_cached_reads(fake_supabase):
+    """Test that writing to a table drops its cached reads."""
+    fake_supabase.rows = [{"id": 1}]
+
+    async def run():
+        await read_table_rows(ReadQuery(table_name="users"))
+        await delete_records(DeleteQuery(table_name="users", filters={"id": 2}))
+        await read_table_rows(ReadQuery(table_name="users"))
+
+    asyncio.run(run())
+    assert [query.args("select") for query in fake_supabase.executed] == [("*",), None, ("*",)]
+
+def test_read_racing_a_write_is_not_served_later(fake_supabase):
+    """Test that a read started before a write can't be cached as current."""
+    fake_supabase.rows = [{"id": 1}]
+
+    async def run():
+        fake_supabase.gate = asyncio.Event()
+        stale_read = asyncio.create_task(read_table_rows(ReadQuery(table_name="users")))
+        await asyncio.sleep(0)
+
+        # The write lands while the read is still waiting on the server
+        fake_supabase.rows = [{"id": 2}]
+        write = asyncio.create_task(delete_records(DeleteQuery(table_name="users", filters={"id": 1})))
+        fake_supabase.gate.set()
+        assert await stale_read == [{"id": 1}]
+        await write
+
+        fake_supabase.gate = None
+        return await read_table_rows(ReadQuery(table_name="users"))
+
+    assert asyncio.run(run()) == [{"id": 2}]
+    assert len(fake_supabase.executed) == 3
+
+def _collect(query, page_size):
+    """Drain iter_table_rows into a list."""
+    async def run():
+        return [row async for row in iter_table_rows(query, page_size=page_size)]
+    return asyncio.run(run())
+
+def test_iter_rows_short_last_page(fake_supabase):
+    """Test that paging continues past a short page until an empty one."""
+    fake_supabase.rows = [{"id": i} for i in range(1200)]
+
+    rows = _collect(ReadQuery(table_name="events"), page_size=500)
+    assert rows == fake_supabase.rows
+    assert [query.args("range") for query in fake_supabase.executed] == [(0, 499), (500, 999), (1000, 1499), (1200, 1699)]
+
+def test_iter_rows_server_row_cap(fake_supabase):
+    """Test that a server capping rows per response doesn't truncate the table."""
+    fake_supabase.rows = [{"id": i} for i in range(2500)]
+    fake_supabase.max_rows = 1000
+
+    rows = _collect(ReadQuery(table_name="events"), page_size=2000)
+    assert rows == fake_supabase.rows
+    assert [query.args("range") for query in fake_supabase.executed] == [(0, 1999), (1000, 2999), (2000, 3999), (2500, 4499)]
+
+def test_iter_rows_exact_page_multiple(fake_supabase):
+    """Test that a table filling whole pages ends with one empty request."""
+    fake_supabase.rows = [{"id": i} for i in range(1000)]
+
+    rows = _collect(ReadQuery(table_name="events"), page_size=500)
+    assert len(rows) == 1000
+    assert [query.args("range") for query in fake_supabase.executed] == [(0, 499), (500, 999), (1000, 1499)]
+
+def test_iter_rows_limit_caps_total(fake_supabase):
+    """Test that limit caps the rows yielded and shrinks the last request."""
+    fake_supabase.rows = [{"id": i} for i in range(2000)]
+
+    rows = _collect(ReadQuery(table_name="events", limit=700), page_size=500)
+    assert rows == fake_supabase.rows[:700]
+    assert [query.args("range") for query in fake_supabase.executed] == [(0, 499), (500, 699)]
+
+def test_iter_rows_limit_equal_to_page_size(fake_supabase):
+    """Test that a limit of exactly one page needs a single request."""
+    fake_supabase.rows = [{"id": i} for i in range(2000)]
+
+    rows = _collect(ReadQuery(table_name="events", limit=500), page_size=500)
+    assert len(rows) == 500
+    assert len(fake_supabase.executed) == 1
+
+def test_failed_write_still_invalidates(fake_supabase):
+    """Test that a write raising on the client drops cached reads anyway."""
+    fake_supabase.rows = [{"id": 1}]
+
+    async def run():
+        await read_table_rows(ReadQuery(table_name="users"))
+        fake_supabase.error = TimeoutError("read timeout")
+        with pytest.raises(TimeoutError):
+            await delete_records(DeleteQuery(table_name="users", filters={"id": 1}))
+        fake_supabase.error = None
+        await read_table_rows(ReadQuery(table_name="users"))
+
+    asyncio.run(run())
+    assert len(fake_supabase.executed) == 3
+
+def test_iter_rows_orders_pages(fake_supabase):
+    """Test that order_by is sent with postgrest's desc flag on every page."""
+    fake_supabase.rows = [{"id": i} for i in range(3)]
+
+    _collect(ReadQuery(table_name="events", order_by={"id": "desc", "name": "asc"}), page_size=2)
+    for query in fake_supabase.executed:
+        orders = [(args, kwargs) for name, args, kwargs in query.calls if name == "order"]
+        assert orders == [(("id",), {"desc": True}), (("name",), {"desc": False})]
+
+@pytest.mark.parametrize("page_size", [0, -1])
+def test_iter_rows_rejects_invalid_page_size(fake_supabase, page_size):
+    """Test that a page size below one is rejected before any request."""
+    with pytest.raises(ValueError):
+        _collect(ReadQuery(table_name="events"), page_size=page_size)
+    assert not fake_supabase.executed
+
+def test_count_rows_requests_exact_count_only(fake_supabase):
+    """Test that counting asks for an exact count without fetching rows."""
+    fake_supabase.count = 42
+
+    count = asyncio.run(count_table_rows(CountQuery(table_name="users", filters={"active": True})))
+    assert count == 42
+    query = fake_supabase.executed[0]
+    assert ("select", ("*",), {"count": "exact", "head": True}) in query.calls
+    assert query.args("match") == ({"active": True},)
+
+def test_count_rows_zero(fake_supabase):
+    """Test that an empty table counts as zero without filters."""
+    fake_supabase.count = 0
+
+    assert asyncio.run(count_table_rows(CountQuery(table_name="users"))) == 0
+    assert fake_supabase.executed[0].args("match") is None
+
+def test_count_rows_without_count_raises(fake_supabase):
+    """Test that a response missing its count is an error, not an empty table."""
+    with pytest.raises(RuntimeError):
+        asyncio.run(count_table_rows(CountQuery(table_name="users")))
@@ -1,41 +1,48 @@
 """Integration tests for the Supabase MCP server."""
+import asyncio
 import os
 import pytest
-from supabase import Client
+from supabase import AsyncClient
 
 from src.supabase_client import get_supabase_client
 from src.db_types import ReadQuery, CreateQuery, UpdateQuery, DeleteQuery
 from src.tools.database import read_table_rows, create_records, update_records, delete_records
 
 @pytest.fixture
-def supabase_client() -> Client:
+def supabase_client() -> AsyncClient:
     """Get Supabase client for testing."""
     client = get_supabase_client()
     if not client:
         pytest.skip("Supabase client not available")
     return client
 
-def test_read_table_rows_integration(supabase_client):
+@pytest.fixture(scope="module")
+def run():
+    """Run coroutines on one event loop so pooled connections stay usable."""
+    with asyncio.Runner() as runner:
+        yield runner.run
+
+def test_read_table_rows_integration(supabase_client, run):
     """Test reading rows from a table."""
     query = ReadQuery(
         table_name="users",
         columns=["id", "email"],
         limit=5
     )
-    result = read_table_rows(query)
+    result = run(read_table_rows(query))
     assert isinstance(result, list)
     if result:
         assert "id" in result[0]
         assert "email" in result[0]
 
-def test_create_records_integration(supabase_client):
+def test_create_records_integration(supabase_client, run):
     """Test creating records in a table."""
     # Clean up any existing test user before running the test
     delete_query = DeleteQuery(
         table_name="users",
         filters={"email": "test@example.com"}
     )
-    delete_records(delete_query)
+    run(delete_records(delete_query))
 
     test_user = {
         "email": "test@example.com",
@@ -45,7 +52,7 @@ def test_create_records_integration(supabase_client):
         table_name="users",
         records=[test_user]
     )
-    result = create_records(query)
+    result = run(create_records(query))
     assert isinstance(result, list)
     assert len(result) == 1
     assert result[0]["email"] == test_user["email"]
@@ -55,17 +62,17 @@ def test_create_records_integration(supabase_client):
         table_name="users",
         filters={"email": test_user["email"]}
     )
-    delete_records(delete_query)
+    run(delete_records(delete_query))
 
 
-def test_update_records_integration(supabase_client):
+def test_update_records_integration(supabase_client, run):
     """Test updating records in a table."""
     # Clean up any existing test user before running the test
     delete_query = DeleteQuery(
         table_name="users",
         filters={"email": "update_test@example.com"}
     )
-    delete_records(delete_query)
+    run(delete_records(delete_query))
 
     # First create a test record
     test_user = {
@@ -76,7 +83,7 @@ def test_update_records_integration(supabase_client):
         table_name="users",
         records=[test_user]
     )
-    created = create_records(create_query)
+    created = run(create_records(create_query))
     
     # Update the record
     update_query = UpdateQuery(
@@ -84,7 +91,7 @@ def test_update_records_integration(supabase_client):
         updates={"name": "Updated Name"},
         filters={"email": test_user["email"]}
     )
-    result = update_records(update_query)
+    result = run(update_records(update_query))
     assert isinstance(result, list)
     assert len(result) == 1
     assert result[0]["name"] == "Updated Name"
@@ -94,17 +101,17 @@ def test_update_records_integration(supabase_client):
         table_name="users",
         filters={"email": test_user["email"]}
     )
-    delete_records(delete_query)
+    run(delete_records(delete_query))
 
 
-def test_delete_records_integration(supabase_client):
+def test_delete_records_integration(supabase_client, run):
     """Test deleting records from a table."""
     # Clean up any existing test user before running the test
     delete_query = DeleteQuery(
         table_name="users",
         filters={"email": "delete_test@example.com"}
     )
-    delete_records(delete_query)
+    run(delete_records(delete_query))
 
     # First create a test record
     test_user = {
@@ -115,14 +122,14 @@ def test_delete_records_integration(supabase_client):
         table_name="users",
         records=[test_user]
     )
-    created = create_records(create_query)
+    created = run(create_records(create_query))
     
     # Delete the record
     delete_query = DeleteQuery(
         table_name="users",
         filters={"email": test_user["email"]}
     )
-    result = delete_records(delete_query)
+    result = run(delete_records(delete_query))
     assert isinstance(result, list)
     assert len(result) == 1
     assert result[0]["email"] == test_user["email"]
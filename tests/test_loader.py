@@ -0,0 +1,135 @@
+"""Tests for key lookup batching using an in-memory Supabase client."""
+import asyncio
+
+import pytest
+from postgrest.exceptions import APIError
+
+from src.db_types import ReadByIdsQuery
+from src.tools import loader
+from src.tools.database import read_by_ids
+from src.tools.loader import KeyLoader
+
+@pytest.fixture(autouse=True)
+def fresh_loaders():
+    """Don't share loaders (and their event-loop futures) between tests."""
+    loader._loaders.clear()
+    yield
+    loader._loaders.clear()
+
+def test_keys_within_window_share_one_query(fake_supabase):
+    """Test that keys requested together are fetched with a single IN query."""
+    fake_supabase.rows = [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    async def run():
+        users = KeyLoader("users", "id")
+        return await asyncio.gather(users.load(1), users.load(3), users.load(4))
+
+    assert asyncio.run(run()) == [[{"id": 1}], [{"id": 3}], []]
+    assert len(fake_supabase.executed) == 1
+    assert fake_supabase.executed[0].args("in_") == ("id", [1, 3, 4])
+
+def test_max_batch_flushes_early(fake_supabase):
+    """Test that a full batch is sent without waiting for the window."""
+    fake_supabase.rows = [{"id": 1}, {"id": 2}, {"id": 3}]
+
+    async def run():
+        users = KeyLoader("users", "id", batch_window_ms=10_000, max_batch=2)
+        full = asyncio.gather(users.load(1), users.load(2))
+        third = users.load(3)
+        # The full batch resolves long before the window would close
+        assert await asyncio.wait_for(full, timeout=1) == [[{"id": 1}], [{"id": 2}]]
+        assert not third.done()
+        users._flush()
+        return await third
+
+    assert asyncio.run(run()) == [{"id": 3}]
+    assert [query.args("in_") for query in fake_supabase.executed] == [("id", [1, 2]), ("id", [3])]
+
+def test_errors_reach_every_caller(fake_supabase):
+    """Test that a failed batch query is raised to each waiting caller."""
+    fake_supabase.error = TimeoutError("read timeout")
+
+    async def run():
+        users = KeyLoader("users", "id")
+        return await asyncio.gather(users.load(1), users.load(2), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, TimeoutError) for result in results)
+    # Transport errors aren't retried key by key
+    assert len(fake_supabase.executed) == 1
+
+def test_bad_key_only_fails_its_own_caller(fake_supabase, monkeypatch):
+    """Test that a key the server rejects doesn't fail other keys in the batch."""
+    fake_supabase.rows = [{"id": 1}]
+    query_cls = type(fake_supabase.table("users"))
+    execute = query_cls.execute
+
+    async def reject_null_keys(query):
+        if None in query.args("in_")[1]:
+            raise APIError({"code": "22P02", "message": "invalid input syntax for type integer"})
+        return await execute(query)
+
+    monkeypatch.setattr(query_cls, "execute", reject_null_keys)
+
+    async def run():
+        users = KeyLoader("users", "id")
+        return await asyncio.gather(users.load(1), users.load(None), return_exceptions=True)
+
+    good, bad = asyncio.run(run())
+    assert good == [{"id": 1}]
+    assert isinstance(bad, APIError)
+    # Only the retried good key reaches the server; both queries with None are rejected
+    assert [query.args("in_") for query in fake_supabase.executed] == [("id", [1])]
+
+def test_keys_match_rows_as_text(fake_supabase):
+    """Test that a text key finds rows whose key column is numeric."""
+    fake_supabase.rows = [{"id": 1, "name": "a"}]
+
+    async def run():
+        users = KeyLoader("users", "id")
+        return await users.load("1")
+
+    assert asyncio.run(run()) == [{"id": 1, "name": "a"}]
+
+def test_integral_float_key_matches_integer_rows(fake_supabase):
+    """Test that a float key finds the integer row PostgREST returns for it."""
+    fake_supabase.rows = [{"id": 1, "name": "a"}]
+
+    async def run():
+        users = KeyLoader("users", "id")
+        return await users.load(1.0)
+
+    assert asyncio.run(run()) == [{"id": 1, "name": "a"}]
+
+def test_upper_case_uuid_key_matches_row(fake_supabase):
+    """Test that a UUID key in any case finds the lower-case row PostgREST returns."""
+    row_id = "5f2b6c1e-8d3a-4e7b-9c0d-1a2b3c4d5e6f"
+    fake_supabase.rows = [{"id": row_id}]
+
+    async def run():
+        users = KeyLoader("users", "id")
+        return await users.load(row_id.upper())
+
+    assert asyncio.run(run()) == [{"id": row_id}]
+
+def test_cancelled_caller_does_not_cancel_others(fake_supabase):
+    """Test that callers waiting on the same key are independent."""
+    fake_supabase.rows = [{"id": 1}]
+
+    async def run():
+        users = KeyLoader("users", "id")
+        first = asyncio.ensure_future(users.load(1))
+        second = asyncio.ensure_future(users.load(1))
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == [{"id": 1}]
+    assert len(fake_supabase.executed) == 1
+
+def test_read_by_ids_returns_each_row_once(fake_supabase):
+    """Test that repeated keys, including the same key as text, return one row."""
+    fake_supabase.rows = [{"id": 1}, {"id": 2}]
+
+    rows = asyncio.run(read_by_ids(ReadByIdsQuery(table_name="users", ids=[1, 1, "1", 2])))
+    assert rows == [{"id": 1}, {"id": 2}]
+    assert fake_supabase.executed[0].args("in_") == ("id", [1, 2])
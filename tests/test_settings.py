@@ -0,0 +1,49 @@
+"""Tests for the Supabase MCP server settings."""
+import pytest
+from src.settings import Settings
+
+def test_settings_read_environment(monkeypatch):
+    """Test that settings are read from environment variables."""
+    monkeypatch.setenv("SUPABASE_PROJECT_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    monkeypatch.setenv("SERVER_PORT", "8080")
+    monkeypatch.setenv("SSE_LISTENER", "0")
+    settings = Settings(_env_file=None)
+    assert settings.supabase_project_url == "https://example.supabase.co"
+    assert settings.supabase_service_role_key == "service-key"
+    assert settings.server_port == 8080
+    assert settings.sse_listener is False
+
+def test_settings_defaults(monkeypatch):
+    """Test default values for optional settings."""
+    for name in ("SUPABASE_MAX_CONNS", "SERVER_PORT", "WEB_CONCURRENCY", "REDIS_URL", "SSE_LISTENER",
+                 "READ_CACHE_ENABLED", "READ_CACHE_TTL"):
+        monkeypatch.delenv(name, raising=False)
+    settings = Settings(_env_file=None)
+    assert settings.supabase_max_conns == 50
+    assert settings.server_port is None
+    assert settings.web_concurrency is None
+    assert settings.redis_url is None
+    assert settings.sse_listener is None
+    assert settings.read_cache_enabled is None
+    assert settings.read_cache_ttl == 30
+
+def test_worker_count(monkeypatch):
+    """Test that more than one worker runs only with Redis or WEB_CONCURRENCY."""
+    for name in ("WEB_CONCURRENCY", "REDIS_URL"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    assert Settings(_env_file=None).worker_count() == 1
+    assert Settings(_env_file=None, redis_url="redis://localhost").worker_count() == 4
+    assert Settings(_env_file=None, redis_url="redis://localhost", web_concurrency=2).worker_count() == 2
+    assert Settings(_env_file=None, web_concurrency=3).worker_count() == 3
+
+def test_use_read_cache(monkeypatch):
+    """Test that the read cache defaults off when several workers may run."""
+    for name in ("WEB_CONCURRENCY", "REDIS_URL", "READ_CACHE_ENABLED"):
+        monkeypatch.delenv(name, raising=False)
+    assert Settings(_env_file=None).use_read_cache() is True
+    assert Settings(_env_file=None, redis_url="redis://localhost").use_read_cache() is False
+    assert Settings(_env_file=None, web_concurrency=1).use_read_cache() is False
+    assert Settings(_env_file=None, redis_url="redis://localhost", read_cache_enabled=True).use_read_cache() is True
+    assert Settings(_env_file=None, read_cache_enabled=False).use_read_cache() is False
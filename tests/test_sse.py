@@ -0,0 +1,176 @@
+"""Tests for the SSE event stream."""
+import asyncio
+
+import pytest
+
+from src import sse
+
+@pytest.fixture(autouse=True)
+def empty_event_window():
+    """Start every test with an empty deduplication window."""
+    sse.recent_event_ids.clear()
+    yield
+    sse.recent_event_ids.clear()
+
+def test_duplicate_events_are_detected():
+    """Test that a repeated event ID is reported as a duplicate."""
+    assert sse._is_duplicate_event("a") is False
+    assert sse._is_duplicate_event("a") is True
+
+def test_events_without_id_are_never_duplicates():
+    """Test that events lacking an ID are always delivered."""
+    assert sse._is_duplicate_event(None) is False
+    assert sse._is_duplicate_event(None) is False
+    assert None not in sse.recent_event_ids
+
+def test_event_window_evicts_oldest_id(monkeypatch):
+    """Test that a full window evicts only its oldest ID."""
+    monkeypatch.setattr(sse, "RECENT_EVENT_IDS_SIZE", 2)
+    for event_id in ("a", "b", "c"):
+        assert sse._is_duplicate_event(event_id) is False
+    assert list(sse.recent_event_ids) == ["b", "c"]
+    assert sse._is_duplicate_event("a") is False
+    assert sse._is_duplicate_event("c") is True
+
+def test_frame_encodes_big_integers():
+    """Test that records with integers beyond 64 bits are still framed."""
+    frame = sse._sse_frame({"record": {"balance": 2**70}})
+    assert frame == b'data: {"record":{"balance":1180591620717411303424}}\n\n'
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point the SSE module at an in-memory Redis with a short listener lock."""
+    fakeredis = pytest.importorskip("fakeredis")
+    from src.settings import Settings
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(sse, "settings", Settings(_env_file=None, sse_listener=None))
+    monkeypatch.setattr(sse, "LISTENER_LOCK_TTL", 3)
+    monkeypatch.setattr(sse, "_start_log_listener", lambda: None)
+    monkeypatch.setattr(sse, "REDIS_URL", "redis://fake")
+    monkeypatch.setattr(sse.Redis, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+    monkeypatch.setattr(sse, "redis", fakeredis.FakeAsyncRedis(server=server))
+    monkeypatch.setattr(sse, "_lock_token", None)
+    monkeypatch.setattr(sse, "_stopping", False)
+    yield lambda: fakeredis.FakeAsyncRedis(server=server)
+    sse.connected_clients.clear()
+
+@pytest.fixture
+def listener_calls(monkeypatch):
+    """Record starts and stops of the realtime listener instead of using Supabase."""
+    calls = {"start": 0, "stop": 0, "fail": 0}
+
+    async def start():
+        calls["start"] += 1
+        if calls["fail"]:
+            calls["fail"] -= 1
+            raise RuntimeError("subscribe failed")
+
+    async def stop():
+        calls["stop"] += 1
+
+    monkeypatch.setattr(sse, "start_supabase_realtime_listener", start)
+    monkeypatch.setattr(sse, "stop_supabase_realtime_listener", stop)
+    return calls
+
+@pytest.fixture
+def instant_sleep(monkeypatch):
+    """
+    Make the election's sleeps return on the next loop iteration.
+
+    Only the SSE module's own waits are shortened; Redis clients keep real
+    timing. The lock TTL is still measured by Redis in real seconds, so within
+    a test a lock only ever leaves its holder by being released or taken.
+    """
+    async def sleep(delay):
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(sse, "_sleep", sleep)
+
+async def _cancel(*tasks):
+    """Stop background tasks the way stop_sse does, failing if they don't finish."""
+    sse._stopping = True
+    for task in tasks:
+        task.cancel()
+    await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=5)
+
+async def _until(condition, timeout=5):
+    """Run the event loop until condition() holds, failing after timeout seconds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.001)
+
+def test_published_frames_reach_local_clients(fake_redis):
+    """Test that a published frame is relayed to this worker's clients."""
+    async def run():
+        queue = asyncio.Queue()
+        sse.connected_clients[id(queue)] = queue
+        relay = asyncio.create_task(sse._relay_published_events())
+        while (await sse.redis.pubsub_numsub(sse.SSE_CHANNEL))[0][1] == 0:
+            await asyncio.sleep(0)
+        await sse._publish(b"data: {}\n\n")
+        try:
+            return await asyncio.wait_for(queue.get(), timeout=1)
+        finally:
+            await _cancel(relay)
+
+    assert asyncio.run(run()) == b"data: {}\n\n"
+
+def test_only_one_worker_starts_the_listener(fake_redis, listener_calls, instant_sleep):
+    """Test that competing workers elect a single realtime listener."""
+    async def run():
+        electors = [asyncio.create_task(sse._elect_realtime_listener()) for _ in range(2)]
+        await _until(lambda: listener_calls["start"] == 1)
+        # Let both workers go through many renew and acquire rounds
+        for _ in range(200):
+            await asyncio.sleep(0)
+        await _cancel(*electors)
+
+    asyncio.run(run())
+    assert listener_calls["start"] == 1
+
+def test_failed_start_hands_the_lock_over(fake_redis, listener_calls, instant_sleep):
+    """Test that a worker that fails to subscribe releases the lock at once."""
+    listener_calls["fail"] = 1
+
+    async def run():
+        electors = [asyncio.create_task(sse._elect_realtime_listener()) for _ in range(2)]
+        # The failed holder's lock can't expire during the test, so only a release lets this pass
+        await _until(lambda: listener_calls["start"] == 2)
+        held = await sse.redis.get(sse.LISTENER_LOCK)
+        await _cancel(*electors)
+        return held
+
+    assert asyncio.run(run()) is not None
+    assert listener_calls["start"] == 2
+
+def test_lost_lock_unsubscribes(fake_redis, listener_calls, instant_sleep):
+    """Test that a worker whose lock is taken stops listening."""
+    async def run():
+        elector = asyncio.create_task(sse._elect_realtime_listener())
+        await _until(lambda: listener_calls["start"] == 1)
+        await sse.redis.set(sse.LISTENER_LOCK, "another-worker")
+        await _until(lambda: listener_calls["stop"] == 1)
+        await _cancel(elector)
+
+    asyncio.run(run())
+    assert listener_calls["start"] == 1
+    assert listener_calls["stop"] == 1
+
+def test_stop_sse_releases_lock_and_cancels_tasks(fake_redis, listener_calls, instant_sleep):
+    """Test that shutdown stops background tasks and frees the listener lock."""
+    async def run():
+        await sse.start_sse()
+        relay, election = sse._relay_task, sse._election_task
+        await _until(lambda: listener_calls["start"] == 1)
+        await sse.stop_sse()
+        return relay, election, await fake_redis().get(sse.LISTENER_LOCK)
+
+    relay, election, lock = asyncio.run(run())
+    assert relay.done() and election.done()
+    assert lock is None
+    assert sse.redis is None and sse._relay_task is None and sse._election_task is None
+    assert listener_calls["start"] == 1
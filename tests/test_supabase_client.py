@@ -0,0 +1,26 @@
+"""Tests for the Supabase client factory."""
+import pytest
+
+from src import supabase_client
+from src.settings import Settings
+
+@pytest.fixture(autouse=True)
+def fresh_client_cache():
+    """Start and end every test without a cached client."""
+    supabase_client._create_supabase_client.cache_clear()
+    yield
+    supabase_client._create_supabase_client.cache_clear()
+
+def test_failed_construction_is_not_cached(monkeypatch):
+    """Test that a failed client construction is retried on the next call."""
+    monkeypatch.setattr(supabase_client, "settings", Settings(_env_file=None, supabase_project_url=""))
+    assert supabase_client.get_supabase_client() is None
+
+    monkeypatch.setattr(
+        supabase_client,
+        "settings",
+        Settings(_env_file=None, supabase_project_url="https://example.supabase.co", supabase_service_role_key="key"),
+    )
+    client = supabase_client.get_supabase_client()
+    assert client is not None
+    assert supabase_client.get_supabase_client() is client
@@ -1,5 +1,6 @@
 """Tests for the Supabase MCP server type definitions."""
 import pytest
+from pydantic import ValidationError
 from src.db_types import ReadQuery, CreateQuery, UpdateQuery, DeleteQuery
 
 def test_read_query_validation():
@@ -57,3 +58,14 @@ def test_delete_query_validation():
     )
     assert query.table_name == "users"
     assert query.filters == {"status": "inactive"}
+
+def test_queries_are_frozen():
+    """Test that validated queries cannot be modified."""
+    query = ReadQuery(table_name="users")
+    with pytest.raises(ValidationError):
+        query.table_name = "accounts"
+
+def test_queries_reject_unknown_fields():
+    """Test that unknown fields are rejected."""
+    with pytest.raises(ValidationError):
+        DeleteQuery(table_name="users", filters={"id": 1}, where={"id": 1})